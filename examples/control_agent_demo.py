@@ -36,10 +36,18 @@ async def control_agent_demo():
         print("  - 'turn right 90 degrees'")
         print("  - 'scan the room'")
         print("  - 'land'")
+        print("  - 'take off; fly forward 1 meter; land' (processed concurrently)")
         print("  - 'quit' - Exit")
-        
+
         command_history = []
-        
+
+        # Bound concurrent API calls so batches stay under the RPM limit
+        semaphore = asyncio.Semaphore(4)
+
+        async def process_with_limit(text: str):
+            async with semaphore:
+                return await control_agent.aprocess_command(text)
+
         while True:
             try:
                 # Get user input
@@ -51,59 +59,73 @@ async def control_agent_demo():
                 if not user_input:
                     continue
                 
-                # Process command
-                print(f"Processing: {user_input}")
-                command_json = control_agent.process_command(user_input)
-                
-                # Display results
-                if command_json.get("error"):
-                    print(f"Error: {command_json.get('description')}")
-                else:
-                    print(f"Generated command:")
-                    print(json.dumps(command_json, indent=2))
-                    
-                    try:
-                        # Validate command
-                        drone_command = DroneCommand.from_dict(command_json)
-                        print(f"✓ Command validation successful")
-                        
-                        # Add to history for sequence validation
-                        command_history.append(drone_command)
-                        
-                        # Check command safety
-                        if validator.is_safe_command(drone_command):
-                            print(f"✓ Safety check passed")
-                        else:
-                            print(f"⚠ Safety check failed")
-                        
-                        # Check sequence if we have multiple commands
-                        if len(command_history) > 1:
-                            warnings = validator.validate_command_sequence(command_history)
-                            if warnings:
-                                print(f"Sequence warnings:")
-                                for warning in warnings:
-                                    print(f"  - {warning}")
-                        
-                    except Exception as e:
-                        print(f"✗ Command validation failed: {e}")
-                
+                # Process command(s) - semicolon-separated inputs are issued
+                # concurrently through the async client
+                inputs = [part.strip() for part in user_input.split(';') if part.strip()]
+                print(f"Processing: {', '.join(inputs)}")
+                results = await asyncio.gather(
+                    *[process_with_limit(text) for text in inputs],
+                    return_exceptions=True
+                )
+
+                for command_json in results:
+                    if isinstance(command_json, Exception):
+                        print(f"Error: {command_json}")
+                        continue
+                    show_command_result(command_json, command_history, validator)
+
             except KeyboardInterrupt:
                 break
             except Exception as e:
                 print(f"Error processing command: {e}")
-        
+
         print("Demo completed")
-        
+
         # Show command history summary
         if command_history:
             print(f"\nCommand History Summary:")
             for i, cmd in enumerate(command_history, 1):
                 print(f"{i}. {cmd.action.value}: {cmd.description}")
-        
+
     except Exception as e:
         print(f"Demo failed: {e}")
 
 
+def show_command_result(command_json, command_history, validator):
+    """Display, validate and record a single processed command."""
+    if command_json.get("error"):
+        print(f"Error: {command_json.get('description')}")
+        return
+
+    print(f"Generated command:")
+    print(json.dumps(command_json, indent=2))
+
+    try:
+        # Validate command
+        drone_command = DroneCommand.from_dict(command_json)
+        print(f"✓ Command validation successful")
+
+        # Add to history for sequence validation
+        command_history.append(drone_command)
+
+        # Check command safety
+        if validator.is_safe_command(drone_command):
+            print(f"✓ Safety check passed")
+        else:
+            print(f"⚠ Safety check failed")
+
+        # Check sequence if we have multiple commands
+        if len(command_history) > 1:
+            warnings = validator.validate_command_sequence(command_history)
+            if warnings:
+                print(f"Sequence warnings:")
+                for warning in warnings:
+                    print(f"  - {warning}")
+
+    except Exception as e:
+        print(f"✗ Command validation failed: {e}")
+
+
 if __name__ == "__main__":
     # Note: This example requires Azure OpenAI to be configured
     print("Control Agent Demo")
@@ -3,14 +3,149 @@ Azure OpenAI Control Agent.
 Converts natural language commands to drone control JSON using Azure OpenAI.
 """
 
-import json
+import copy
 import logging
-from typing import Dict, Any, Optional
-from openai import AzureOpenAI
+import re
+import time
+import orjson
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+import httpx
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from azure.identity import DefaultAzureCredential
 
 from config.settings import settings, config_manager
 
+try:
+    from jsonschema import Draft7Validator
+except ImportError:
+    # jsonschema is optional; _validate_command falls back to basic checks
+    Draft7Validator = None
+
+# Azure OpenAI clients cached per (endpoint, api_version, key hash) so that
+# repeated ControlAgent construction reuses a warm connection pool instead of
+# paying a fresh TCP/TLS handshake on the first call of every session.
+_CLIENT_CACHE: Dict[tuple, AzureOpenAI] = {}
+_ASYNC_CLIENT_CACHE: Dict[tuple, AsyncAzureOpenAI] = {}
+
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=20, keepalive_expiry=300)
+
+
+def _get_shared_client(endpoint: str, api_version: str, api_key: str) -> AzureOpenAI:
+    """Get (or create) the shared Azure OpenAI client for these credentials."""
+    cache_key = (endpoint, api_version, hash(api_key))
+    client = _CLIENT_CACHE.get(cache_key)
+    if client is None:
+        client = AzureOpenAI(
+            api_key=api_key,
+            api_version=api_version,
+            azure_endpoint=endpoint,
+            http_client=httpx.Client(limits=_POOL_LIMITS)
+        )
+        _CLIENT_CACHE[cache_key] = client
+    return client
+
+
+def _get_shared_async_client(endpoint: str, api_version: str, api_key: str) -> AsyncAzureOpenAI:
+    """Get (or create) the shared async Azure OpenAI client for these credentials."""
+    cache_key = (endpoint, api_version, hash(api_key))
+    client = _ASYNC_CLIENT_CACHE.get(cache_key)
+    if client is None:
+        client = AsyncAzureOpenAI(
+            api_key=api_key,
+            api_version=api_version,
+            azure_endpoint=endpoint,
+            http_client=httpx.AsyncClient(limits=_POOL_LIMITS)
+        )
+        _ASYNC_CLIENT_CACHE[cache_key] = client
+    return client
+
+
+# Command schema for the drone - static source code, shared by every agent
+_COMMAND_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {
+            "type": "string",
+            "enum": ["takeoff", "land", "move", "rotate", "hover", "scan", "emergency"]
+        },
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "direction": {"type": "string", "enum": ["forward", "back", "left", "right", "up", "down"]},
+                "distance": {"type": "number", "minimum": 0, "maximum": 500},
+                "angle": {"type": "number", "minimum": -360, "maximum": 360},
+                "duration": {"type": "number", "minimum": 0, "maximum": 30},
+                "speed": {"type": "number", "minimum": 10, "maximum": 100}
+            }
+        },
+        "description": {"type": "string"},
+        "safety_check": {"type": "boolean"}
+    },
+    "required": ["action", "description", "safety_check"]
+}
+
+
+def _build_system_prompt() -> str:
+    """
+    Build the system prompt for the Azure OpenAI model.
+
+    The static content (schema, guidelines, examples) comes first so the
+    prompt forms a stable prefix; any dynamic content should be appended
+    at the end to keep Azure's prefix-match cache effective.
+    """
+    return f"""You are a drone control agent that converts natural language commands into JSON commands for a Tello drone.
+
+IMPORTANT: You must ALWAYS respond with valid JSON that matches this exact schema:
+
+{orjson.dumps(_COMMAND_SCHEMA).decode()}
+
+Guidelines:
+1. Safety first - set safety_check to false only for emergency commands
+2. Reasonable defaults: speed=50, distance=100cm for movements
+3. For scan/search commands, use "scan" action with hover parameters
+4. For navigation commands, use "move" action with direction and distance
+5. Emergency stop always uses "emergency" action
+6. Rotate commands use "rotate" action with angle parameter
+
+Examples:
+- "take off" → {{"action": "takeoff", "description": "Taking off", "safety_check": true}}
+- "fly forward 2 meters" → {{"action": "move", "parameters": {{"direction": "forward", "distance": 200}}, "description": "Moving forward 2 meters", "safety_check": true}}
+- "turn right 90 degrees" → {{"action": "rotate", "parameters": {{"angle": 90}}, "description": "Rotating right 90 degrees", "safety_check": true}}
+- "scan the room" → {{"action": "scan", "parameters": {{"duration": 10}}, "description": "Scanning room for objects", "safety_check": true}}
+
+Convert the user's command to valid JSON following these guidelines."""
+
+
+# Built once at import so every agent (and every process) sends byte-identical
+# prompt prefixes, maximizing Azure's prefix-cache hit rate
+_SYSTEM_PROMPT = _build_system_prompt()
+_SCHEMA_VALIDATOR = Draft7Validator(_COMMAND_SCHEMA) if Draft7Validator else None
+
+# High-frequency, unambiguous phrases dispatched locally without touching
+# Azure OpenAI - these are deterministic single-action commands where an LLM
+# round-trip adds latency but no value
+_LOCAL_COMMANDS = [
+    (re.compile(r"^\s*(take\s*off|takeoff)\s*$", re.IGNORECASE),
+     {"action": "takeoff", "description": "Taking off", "safety_check": True}),
+    (re.compile(r"^\s*land\s*$", re.IGNORECASE),
+     {"action": "land", "description": "Landing", "safety_check": True}),
+    (re.compile(r"^\s*hover\s*$", re.IGNORECASE),
+     {"action": "hover", "parameters": {"duration": 3}, "description": "Hovering in place", "safety_check": True}),
+    (re.compile(r"^\s*emergency(\s+stop)?\s*$", re.IGNORECASE),
+     {"action": "emergency", "description": "Emergency stop", "safety_check": False}),
+]
+
+
+def _match_local_command(natural_language_input: str) -> Optional[Dict[str, Any]]:
+    """Return a copy of the local command template matching the input, if any."""
+    for pattern, template in _LOCAL_COMMANDS:
+        if pattern.match(natural_language_input):
+            # Deep copy: a shallow dict() would share nested dicts like the
+            # hover parameters, letting callers mutate the module template
+            return copy.deepcopy(template)
+    return None
+
 
 class ControlAgent:
     """
@@ -20,35 +155,40 @@ class ControlAgent:
     commands that can be executed by the drone controller.
     """
     
-    def __init__(self):
+    # Maximum number of processed commands kept in the local LRU cache
+    COMMAND_CACHE_SIZE = 512
+
+    # Shared validation constants - built once so the fallback validation
+    # path does no per-call list allocation and gets O(1) membership tests
+    _REQUIRED_FIELDS = ("action", "description", "safety_check")
+    _VALID_ACTIONS = frozenset({"takeoff", "land", "move", "rotate", "hover", "scan", "emergency"})
+
+    def __init__(self, max_tokens: int = 150):
         self.logger = logging.getLogger(__name__)
+        # Generated commands are tiny (~50-120 tokens); a tight budget keeps
+        # generation latency bounded and lets runaway completions fail fast
+        self.max_tokens = max_tokens
         self.client = None
+        self.aclient = None
         self._setup_azure_openai()
-        
-        # Define the command schema for the drone
-        self.command_schema = {
-            "type": "object",
-            "properties": {
-                "action": {
-                    "type": "string",
-                    "enum": ["takeoff", "land", "move", "rotate", "hover", "scan", "emergency"]
-                },
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "direction": {"type": "string", "enum": ["forward", "back", "left", "right", "up", "down"]},
-                        "distance": {"type": "number", "minimum": 0, "maximum": 500},
-                        "angle": {"type": "number", "minimum": -360, "maximum": 360},
-                        "duration": {"type": "number", "minimum": 0, "maximum": 30},
-                        "speed": {"type": "number", "minimum": 10, "maximum": 100}
-                    }
-                },
-                "description": {"type": "string"},
-                "safety_check": {"type": "boolean"}
-            },
-            "required": ["action", "description", "safety_check"]
-        }
-    
+
+        # Token accounting for the Azure prompt cache; requires
+        # api_version >= 2024-10-01-preview for cached_tokens to be reported
+        self.cache_hit_tokens = 0
+        self.total_prompt_tokens = 0
+
+        # LRU cache of normalized input -> serialized command JSON. Repeated
+        # commands like "take off" are deterministic (temperature=0.1), so
+        # identical inputs can skip the Azure OpenAI round-trip entirely.
+        # Entries are stored as JSON strings so cached results stay immutable.
+        self._command_cache: "OrderedDict[str, str]" = OrderedDict()
+
+        # Schema, compiled validator and system prompt are module-level
+        # constants built once at import; instances just reference them
+        self.command_schema = _COMMAND_SCHEMA
+        self._validator = _SCHEMA_VALIDATOR
+        self._system_prompt = _SYSTEM_PROMPT
+
     def _setup_azure_openai(self):
         """Setup Azure OpenAI client with secure authentication."""
         try:
@@ -58,85 +198,293 @@ class ControlAgent:
             if not api_key:
                 raise ValueError("Azure OpenAI API key not found in Key Vault or environment")
             
-            self.client = AzureOpenAI(
-                api_key=api_key,
-                api_version=settings.azure_openai_api_version,
-                azure_endpoint=settings.azure_openai_endpoint
+            self.client = _get_shared_client(
+                settings.azure_openai_endpoint,
+                settings.azure_openai_api_version,
+                api_key
             )
-            
+            self.aclient = _get_shared_async_client(
+                settings.azure_openai_endpoint,
+                settings.azure_openai_api_version,
+                api_key
+            )
+
             self.logger.info("Azure OpenAI client initialized successfully")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize Azure OpenAI client: {e}")
             raise
     
-    def process_command(self, natural_language_input: str) -> Dict[str, Any]:
+    def process_command(self, natural_language_input: str, stream: bool = False) -> Dict[str, Any]:
         """
         Process natural language input and convert to drone command JSON.
-        
+
         Args:
             natural_language_input: User's natural language command
-            
+            stream: If True, stream the completion so processing starts at
+                time-to-first-token instead of waiting for the full response
+
         Returns:
             Structured JSON command for drone execution
-            
+
         Raises:
             Exception: If command processing fails
         """
         try:
-            system_prompt = self._get_system_prompt()
-            
-            response = self.client.chat.completions.create(
+            # Unambiguous single-action phrases are dispatched locally with no
+            # network round-trip at all
+            local_command = _match_local_command(natural_language_input)
+            if local_command is not None:
+                self.logger.debug(f"Locally dispatched command: {natural_language_input}")
+                return local_command
+
+            # Check the local cache first - identical repeats skip the API
+            normalized_input = natural_language_input.strip().lower()
+            cached_command = self._cache_get(normalized_input)
+            if cached_command is not None:
+                self.logger.debug(f"Command cache hit: {normalized_input}")
+                return orjson.loads(cached_command)
+
+            messages = [
+                {"role": "system", "content": self._system_prompt},
+                {"role": "user", "content": natural_language_input}
+            ]
+
+            if stream:
+                content = self._stream_completion(messages)
+            else:
+                response = self.client.chat.completions.create(
+                    model=settings.azure_openai_deployment_name,
+                    messages=messages,
+                    temperature=0.1,  # Low temperature for consistent outputs
+                    max_tokens=self.max_tokens,
+                    response_format={"type": "json_object"}
+                )
+                content = response.choices[0].message.content
+                self._record_usage(response)
+
+            # Parse the JSON response
+            command_json = orjson.loads(content)
+
+            # Validate the command structure
+            if not self._validate_command(command_json):
+                raise ValueError("Generated command does not match expected schema")
+
+            # Cache only validated commands; error responses are never cached
+            self._cache_put(normalized_input, orjson.dumps(command_json))
+
+            self.logger.info(f"Successfully processed command: {natural_language_input}")
+            self.logger.debug(f"Generated command: {command_json}")
+
+            return command_json
+
+        except Exception as e:
+            self.logger.error(f"Failed to process command '{natural_language_input}': {e}")
+            return self._get_error_command(str(e))
+    
+    def _record_usage(self, response):
+        """
+        Accumulate prompt/cached token counts from a completion response.
+
+        Logging the cached ratio is what makes the prompt-caching work
+        verifiable - a healthy setup shows most prompt tokens served from
+        Azure's prefix cache on every call after the first.
+        """
+        usage = getattr(response, "usage", None)
+        if usage is None or usage.prompt_tokens is None:
+            return
+
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+
+        self.total_prompt_tokens += usage.prompt_tokens
+        self.cache_hit_tokens += cached_tokens
+        self.logger.debug(
+            f"Prompt tokens: {usage.prompt_tokens} ({cached_tokens} served from cache)"
+        )
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cumulative prompt-token counts and the cached-token ratio."""
+        return {
+            "total_prompt_tokens": self.total_prompt_tokens,
+            "cache_hit_tokens": self.cache_hit_tokens,
+            "cache_hit_ratio": (
+                self.cache_hit_tokens / self.total_prompt_tokens
+                if self.total_prompt_tokens else 0.0
+            )
+        }
+
+    def _stream_completion(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Stream a chat completion and return the assembled response text.
+
+        The generated JSON is small, so total latency is dominated by time to
+        first token; streaming lets the first delta arrive (and be logged)
+        hundreds of milliseconds before the completion finishes.
+        """
+        stream = self.client.chat.completions.create(
+            model=settings.azure_openai_deployment_name,
+            messages=messages,
+            temperature=0.1,  # Low temperature for consistent outputs
+            max_tokens=self.max_tokens,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+
+        chunks = []
+        start_time = time.perf_counter()
+        first_token_time = None
+
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if first_token_time is None:
+                    first_token_time = time.perf_counter() - start_time
+                    self.logger.debug(f"First token after {first_token_time * 1000:.0f}ms")
+                chunks.append(delta)
+
+        return "".join(chunks)
+
+    async def aprocess_command(self, natural_language_input: str) -> Dict[str, Any]:
+        """
+        Async variant of process_command using AsyncAzureOpenAI.
+
+        Allows callers (e.g. scripted demos) to issue multiple commands
+        concurrently under a semaphore instead of serializing round-trips.
+
+        Args:
+            natural_language_input: User's natural language command
+
+        Returns:
+            Structured JSON command for drone execution
+        """
+        try:
+            # Unambiguous single-action phrases are dispatched locally with no
+            # network round-trip at all
+            local_command = _match_local_command(natural_language_input)
+            if local_command is not None:
+                self.logger.debug(f"Locally dispatched command: {natural_language_input}")
+                return local_command
+
+            normalized_input = natural_language_input.strip().lower()
+            cached_command = self._cache_get(normalized_input)
+            if cached_command is not None:
+                self.logger.debug(f"Command cache hit: {normalized_input}")
+                return orjson.loads(cached_command)
+
+            response = await self.aclient.chat.completions.create(
                 model=settings.azure_openai_deployment_name,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": self._system_prompt},
                     {"role": "user", "content": natural_language_input}
                 ],
                 temperature=0.1,  # Low temperature for consistent outputs
-                max_tokens=500,
+                max_tokens=self.max_tokens,
                 response_format={"type": "json_object"}
             )
-            
-            # Parse the JSON response
-            command_json = json.loads(response.choices[0].message.content)
-            
-            # Validate the command structure
+
+            self._record_usage(response)
+            command_json = orjson.loads(response.choices[0].message.content)
+
             if not self._validate_command(command_json):
                 raise ValueError("Generated command does not match expected schema")
-            
+
+            self._cache_put(normalized_input, orjson.dumps(command_json))
+
             self.logger.info(f"Successfully processed command: {natural_language_input}")
             self.logger.debug(f"Generated command: {command_json}")
-            
+
             return command_json
-            
+
         except Exception as e:
             self.logger.error(f"Failed to process command '{natural_language_input}': {e}")
             return self._get_error_command(str(e))
-    
-    def _get_system_prompt(self) -> str:
-        """Get the system prompt for the Azure OpenAI model."""
-        return f"""You are a drone control agent that converts natural language commands into JSON commands for a Tello drone.
 
-IMPORTANT: You must ALWAYS respond with valid JSON that matches this exact schema:
+    def process_commands(self, natural_language_inputs: List[str]) -> List[Dict[str, Any]]:
+        """
+        Process multiple natural language inputs in a single chat request.
 
-{json.dumps(self.command_schema, indent=2)}
+        Batching amortizes the network round-trip and the per-request RPM
+        quota: N inputs consume one request instead of N. Useful for scripted
+        flight plans or replaying a recorded session.
 
-Guidelines:
-1. Safety first - set safety_check to false only for emergency commands
-2. Reasonable defaults: speed=50, distance=100cm for movements
-3. For scan/search commands, use "scan" action with hover parameters
-4. For navigation commands, use "move" action with direction and distance
-5. Emergency stop always uses "emergency" action
-6. Rotate commands use "rotate" action with angle parameter
+        Args:
+            natural_language_inputs: User commands, in execution order
 
-Examples:
-- "take off" → {{"action": "takeoff", "description": "Taking off", "safety_check": true}}
-- "fly forward 2 meters" → {{"action": "move", "parameters": {{"direction": "forward", "distance": 200}}, "description": "Moving forward 2 meters", "safety_check": true}}
-- "turn right 90 degrees" → {{"action": "rotate", "parameters": {{"angle": 90}}, "description": "Rotating right 90 degrees", "safety_check": true}}
-- "scan the room" → {{"action": "scan", "parameters": {{"duration": 10}}, "description": "Scanning room for objects", "safety_check": true}}
+        Returns:
+            One structured JSON command per input, in the same order
+        """
+        if not natural_language_inputs:
+            return []
+
+        try:
+            numbered_inputs = "\n".join(
+                f"{i}. {text}" for i, text in enumerate(natural_language_inputs, 1)
+            )
+            batch_request = (
+                "Convert each of the following numbered commands into a command "
+                "object following the guidelines. Respond with a JSON object of "
+                'the form {"commands": [...]} containing exactly one command '
+                "object per input, in the same order:\n" + numbered_inputs
+            )
+
+            response = self.client.chat.completions.create(
+                model=settings.azure_openai_deployment_name,
+                messages=[
+                    {"role": "system", "content": self._system_prompt},
+                    {"role": "user", "content": batch_request}
+                ],
+                temperature=0.1,  # Low temperature for consistent outputs
+                max_tokens=min(4000, self.max_tokens * len(natural_language_inputs)),
+                response_format={"type": "json_object"}
+            )
+
+            self._record_usage(response)
+            payload = orjson.loads(response.choices[0].message.content)
+            commands = payload.get("commands") if isinstance(payload, dict) else payload
+
+            if not isinstance(commands, list) or len(commands) != len(natural_language_inputs):
+                raise ValueError("Batched response does not contain one command per input")
+
+            # Validate each command individually; bad entries become error
+            # commands so the caller can still line results up with inputs
+            results = []
+            for text, command_json in zip(natural_language_inputs, commands):
+                if self._validate_command(command_json):
+                    results.append(command_json)
+                else:
+                    self.logger.warning(f"Batched command failed validation: {text}")
+                    results.append(self._get_error_command(
+                        f"Generated command for '{text}' does not match expected schema"
+                    ))
+
+            self.logger.info(f"Successfully processed batch of {len(results)} commands")
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Failed to process command batch: {e}")
+            return [self._get_error_command(str(e)) for _ in natural_language_inputs]
+
+    def _cache_get(self, normalized_input: str) -> Optional[str]:
+        """Look up a cached command, refreshing its LRU position on hit."""
+        cached = self._command_cache.get(normalized_input)
+        if cached is not None:
+            self._command_cache.move_to_end(normalized_input)
+        return cached
+
+    def _cache_put(self, normalized_input: str, command_json: str):
+        """Store a processed command, evicting the oldest entry when full."""
+        self._command_cache[normalized_input] = command_json
+        self._command_cache.move_to_end(normalized_input)
+        if len(self._command_cache) > self.COMMAND_CACHE_SIZE:
+            self._command_cache.popitem(last=False)
+
+    def cache_clear(self):
+        """Clear the local command cache."""
+        self._command_cache.clear()
 
-Convert the user's command to valid JSON following these guidelines."""
-    
     def _validate_command(self, command: Dict[str, Any]) -> bool:
         """
         Validate command structure against schema.
@@ -148,17 +496,19 @@ Convert the user's command to valid JSON following these guidelines."""
             True if valid, False otherwise
         """
         try:
-            # Basic structure validation
+            # Preferred path: full schema validation via the compiled validator
+            if self._validator is not None:
+                return self._validator.is_valid(command)
+
+            # Fallback: basic structure validation
             if not isinstance(command, dict):
                 return False
-            
-            required_fields = ["action", "description", "safety_check"]
-            if not all(field in command for field in required_fields):
+
+            if not all(field in command for field in self._REQUIRED_FIELDS):
                 return False
-            
+
             # Validate action
-            valid_actions = ["takeoff", "land", "move", "rotate", "hover", "scan", "emergency"]
-            if command["action"] not in valid_actions:
+            if command["action"] not in self._VALID_ACTIONS:
                 return False
             
             # Validate safety_check
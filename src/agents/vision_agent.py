@@ -6,6 +6,7 @@ Provides real-time object detection and analysis using Azure AI Vision API.
 import logging
 import asyncio
 from typing import List, Dict, Any, Optional
+import cv2
 import numpy as np
 from PIL import Image
 import io
@@ -327,9 +328,12 @@ class VisionAgent:
         
         # Handle numpy array
         if isinstance(image, np.ndarray):
-            # Convert numpy array to PIL Image (assumes RGB format)
+            # Convert numpy array to PIL Image (assumes RGB format).
+            # convertScaleAbs fuses the scale, saturation clamp, and uint8
+            # cast into one pass instead of the float and uint8 temporaries
+            # that (image * 255).astype(...) allocates
             if image.dtype != np.uint8:
-                image = (image * 255).astype(np.uint8)
+                image = cv2.convertScaleAbs(image, alpha=255.0)
             
             pil_image = Image.fromarray(image)
             
@@ -24,7 +24,7 @@ class Settings(BaseSettings):
     # Azure OpenAI Configuration
     azure_openai_endpoint: str = Field(..., env="AZURE_OPENAI_ENDPOINT")
     azure_openai_api_key: Optional[str] = Field(None, env="AZURE_OPENAI_API_KEY")
-    azure_openai_api_version: str = Field("2024-08-01-preview", env="AZURE_OPENAI_API_VERSION")
+    azure_openai_api_version: str = Field("2024-10-01-preview", env="AZURE_OPENAI_API_VERSION")
     azure_openai_deployment_name: str = Field("gpt-4", env="AZURE_OPENAI_DEPLOYMENT_NAME")
     
     # Azure AI Vision Configuration
@@ -35,7 +35,9 @@ class TelloController:
         self.video_thread = None
         self.frame_callback: Optional[Callable[[np.ndarray], None]] = None
         self.current_frame: Optional[np.ndarray] = None
-        self._stop_video = False
+        # Event rather than a bare bool so stop_video_stream can signal the
+        # video thread without racing against its loop check
+        self._stop_video = threading.Event()
         
         # Battery and status monitoring
         self.battery_level = 0
@@ -323,8 +325,8 @@ class TelloController:
                 self.logger.error("Failed to start video stream")
                 return
             
-            self._stop_video = False
-            
+            self._stop_video.clear()
+
             # Start video processing thread
             self.video_thread = threading.Thread(target=self._video_loop, daemon=True)
             self.video_thread.start()
@@ -337,8 +339,8 @@ class TelloController:
     async def stop_video_stream(self):
         """Stop video streaming."""
         try:
-            self._stop_video = True
-            
+            self._stop_video.set()
+
             if self.video_thread and self.video_thread.is_alive():
                 self.video_thread.join(timeout=5)
             
@@ -354,7 +356,7 @@ class TelloController:
     
     def _video_loop(self):
         """Video processing loop (runs in separate thread)."""
-        while not self._stop_video:
+        while not self._stop_video.is_set():
             try:
                 frame = self.tello.get_frame_read().frame
                 if frame is not None:
@@ -364,8 +366,10 @@ class TelloController:
                     if self.frame_callback:
                         self.frame_callback(frame)
                 
-                time.sleep(1/30)  # 30 FPS
-                
+                # Kernel-timed wait that doubles as the stop signal: the loop
+                # paces at 30 FPS but wakes immediately when stop is requested
+                self._stop_video.wait(1/30)
+
             except Exception as e:
                 self.logger.error(f"Video loop error: {e}")
                 break
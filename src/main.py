@@ -5,29 +5,61 @@ Now supports user command input with vision assistance.
 
 import asyncio
 import logging
+import re
+import selectors
 import signal
 import sys
 import os
+import time
 from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
 import threading
-import queue
 
 # Add src to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import click
+import cv2
 from PIL import Image
 import numpy as np
 
 from config.settings import settings, setup_logging
-from agents.vision_agent import VisionAgent
-from vision.camera_manager import CameraManager
 
-# Import drone-related modules only when needed
+# Import heavyweight modules only when needed: the drone stack stays out of
+# vision-only runs, and the vision stack (Azure SDK clients, camera
+# backends) is deferred until initialize() so startup and --help stay fast
 ControlAgent = None
 TelloController = None
 DroneCommand = None
 DroneAction = None
+VisionAgent = None
+CameraManager = None
+
+# Command trigger patterns, compiled once - each check is a single scan of
+# the input instead of N lowercase+substring passes per command
+VISION_TRIGGER_RE = re.compile(r'\b(analyze|detect|find|scan|rotate|capture|search|look)\b', re.IGNORECASE)
+VISION_ONLY_TRIGGER_RE = re.compile(r'\b(analyze|capture|detect|look)\b', re.IGNORECASE)
+CONTINUOUS_RE = re.compile(r'\b(continuous|monitor)\b', re.IGNORECASE)
+
+
+def _frame_to_rgb_uint8(frame: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert a raw camera frame to a uint8 RGB array in minimal passes.
+
+    Both steps run through OpenCV's vectorized kernels: convertScaleAbs
+    fuses scale+clamp+cast into one pass (instead of the frame*255 and
+    .astype temporaries), and cvtColor writes the channel swap straight
+    into a contiguous buffer instead of a strided reverse slice. When a
+    matching ``dst`` buffer is supplied, cvtColor writes into it in place
+    so steady-state frames allocate nothing.
+    """
+    if frame.dtype != np.uint8:
+        frame = cv2.convertScaleAbs(frame, alpha=255.0)
+    if frame.ndim == 3 and frame.shape[2] == 3:
+        if dst is not None and dst.shape == frame.shape:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return frame
 
 
 class TelloDroneAgent:
@@ -44,30 +76,69 @@ class TelloDroneAgent:
         self.tello_controller = None
         self.camera_manager = None
         
-        # Command queue for user input
-        self.command_queue = queue.Queue()
+        # Async queues are created in initialize() once the event loop is
+        # running: constructing them here would bind get_event_loop()'s loop
+        # on Python 3.8/3.9, which is not the loop asyncio.run() creates
+        self.command_queue = None
+        self._loop = None
         self.current_task = None
+        self.frame_queue = None
+
+        # Dedicated single-thread executor so blocking camera reads run off
+        # the event loop but stay serialized on one camera thread
+        self._capture_executor = None
         self.vision_analysis_enabled = False
         self.drone_is_flying = False  # Track if drone is airborne
         
         # Vision data for command execution
         self.latest_frame = None
         self.latest_analysis = None
+
+        # Reusable RGB output buffer for frame conversion, allocated lazily
+        # once the frame geometry is known
+        self._rgb_buf = None
         
     async def initialize(self):
         """Initialize all components."""
         try:
             self.logger.info("Initializing Tello Drone AI Agent...")
-            
+
+            # Remember the running loop so worker threads can hand commands
+            # over to the async queue
+            self._loop = asyncio.get_running_loop()
+
+            # Command queue for user input; async so the executor coroutine
+            # can block on get() instead of polling. Fed from the input
+            # thread via loop.call_soon_threadsafe in add_command.
+            self.command_queue = asyncio.Queue()
+
+            # Single-slot frame buffer between the capture producer and the
+            # processing consumer; the producer drops the stale frame when
+            # the consumer falls behind so analysis always sees the
+            # freshest frame
+            self.frame_queue = asyncio.Queue(maxsize=1)
+
+            self._capture_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="frame-capture"
+            )
+
+            # Import vision modules on first use
+            global VisionAgent, CameraManager
+            from agents.vision_agent import VisionAgent
+            from vision.camera_manager import CameraManager
+
             # Initialize vision agent
             self.vision_agent = VisionAgent()
             self.logger.info("Vision agent initialized")
             
-            # Initialize camera manager
+            # Initialize camera manager. No frame callback: frames flow
+            # through the polling pipeline in run() (_capture_frames ->
+            # _process_frames); registering the callback as well would
+            # analyze every frame twice
             camera_source = settings.camera_source
             self.camera_manager = CameraManager(
                 source=camera_source,
-                frame_callback=self.process_frame
+                frame_callback=None
             )
             self.logger.info(f"Camera manager initialized with source: {camera_source}")
             
@@ -97,23 +168,25 @@ class TelloDroneAgent:
     async def process_frame(self, frame) -> None:
         """Process a single frame from the camera (only when vision analysis is enabled)."""
         try:
-            # Always store the latest frame
+            # Steady state is analysis off: keep just the raw reference (the
+            # next enabled frame gets converted) and skip the per-frame
+            # scale/cvtColor traffic entirely
+            if not self.vision_analysis_enabled:
+                self.latest_frame = frame
+                return
+
             if isinstance(frame, Image.Image):
                 self.latest_frame = frame
             else:
-                # Convert numpy array to PIL Image
-                if frame.dtype != np.uint8:
-                    frame = (frame * 255).astype(np.uint8)
-                
-                if len(frame.shape) == 3 and frame.shape[2] == 3:
-                    frame_rgb = frame[:, :, ::-1]  # BGR to RGB
-                else:
-                    frame_rgb = frame
-                
-                self.latest_frame = Image.fromarray(frame_rgb)
+                # Keep the ndarray as-is: analyze_image accepts arrays
+                # directly, so wrapping in a PIL image here would only add a
+                # full-frame copy on every frame
+                if (self._rgb_buf is None and frame.ndim == 3
+                        and frame.shape[2] == 3):
+                    self._rgb_buf = np.empty(frame.shape, dtype=np.uint8)
+                self.latest_frame = _frame_to_rgb_uint8(frame, dst=self._rgb_buf)
             
-            # Only analyze if vision analysis is enabled (during specific tasks)
-            if self.vision_analysis_enabled and self.vision_agent:
+            if self.vision_agent:
                 analysis = await self.vision_agent.analyze_image(self.latest_frame)
                 if analysis:
                     self.latest_analysis = analysis
@@ -123,66 +196,67 @@ class TelloDroneAgent:
             self.logger.error(f"Error processing frame: {e}")
     
     def add_command(self, command_text: str):
-        """Add a user command to the queue."""
-        self.command_queue.put(command_text)
+        """Add a user command to the queue (safe to call from any thread)."""
+        if self.command_queue is None:
+            self.logger.warning(f"Command dropped - agent not initialized: {command_text}")
+            return
+        self._loop.call_soon_threadsafe(self.command_queue.put_nowait, command_text)
         self.logger.info(f"Command queued: {command_text}")
     
     async def execute_user_commands(self):
         """Execute user commands from the queue."""
         while self.running:
             try:
-                # Check for new commands (non-blocking)
-                try:
-                    command_text = self.command_queue.get_nowait()
-                    self.logger.info(f"🎮 Executing command: {command_text}")
-                    
-                    # Enable vision analysis for commands that might need it
-                    # Let the control agent decide if vision is needed
-                    if any(keyword in command_text.lower() for keyword in 
-                           ['analyze', 'detect', 'find', 'scan', 'rotate', 'capture', 'search', 'look']):
-                        self.vision_analysis_enabled = True
-                        self.logger.info("📹 Vision analysis enabled for this command")
-                    
-                    # Use control agent for ALL commands (natural language processing)
-                    if self.control_agent:
-                        command = await self.control_agent.process_command(command_text)
-                        if command and self.tello_controller:
-                            # Track takeoff/landing state
-                            if command.action == DroneAction.TAKEOFF:
-                                self.drone_is_flying = True
-                                self.logger.info("🛫 Drone state: FLYING")
-                            elif command.action == DroneAction.LAND:
-                                self.drone_is_flying = False
-                                self.logger.info("🛬 Drone state: LANDED")
-                            
-                            # Check if this is a 360-degree scan command
-                            if (command.action == DroneAction.ROTATE_CLOCKWISE and 
-                                "360" in command_text.lower() and "analyze" in command_text.lower()):
-                                await self._execute_360_scan()
-                            else:
-                                # Execute the command normally
-                                await self.tello_controller.execute_command(command)
+                # Block until a command arrives - no polling wakeups, and new
+                # commands dispatch immediately instead of up to 100ms later
+                command_text = await self.command_queue.get()
+                lower = command_text.lower()
+                self.logger.info(f"🎮 Executing command: {command_text}")
+
+                # Enable vision analysis for commands that might need it
+                # Let the control agent decide if vision is needed
+                if VISION_TRIGGER_RE.search(command_text) is not None:
+                    self.vision_analysis_enabled = True
+                    self.logger.info("📹 Vision analysis enabled for this command")
+
+                # Use control agent for ALL commands (natural language processing)
+                if self.control_agent:
+                    command = await self.control_agent.process_command(command_text)
+                    if command and self.tello_controller:
+                        # Track takeoff/landing state
+                        if command.action == DroneAction.TAKEOFF:
+                            self.drone_is_flying = True
+                            self.logger.info("🛫 Drone state: FLYING")
+                        elif command.action == DroneAction.LAND:
+                            self.drone_is_flying = False
+                            self.logger.info("🛬 Drone state: LANDED")
+
+                        # Check if this is a 360-degree scan command
+                        if (command.action == DroneAction.ROTATE_CLOCKWISE and
+                            "360" in lower and "analyze" in lower):
+                            await self._execute_360_scan()
                         else:
-                            self.logger.warning("⚠️  Control agent couldn't process the command")
+                            # Execute the command normally
+                            await self.tello_controller.execute_command(command)
                     else:
-                        # Vision-only mode: handle basic vision commands
-                        if any(keyword in command_text.lower() for keyword in ['analyze', 'capture', 'detect', 'look']):
-                            await self._execute_image_analysis()
-                        else:
-                            self.logger.info("ℹ️  Vision-only mode: Only vision analysis commands are supported")
-                            self.logger.info("     Try: 'analyze image', 'capture and analyze', 'detect objects'")
-                    
-                    # Disable vision analysis after command (unless it's a continuous scan)
-                    if "continuous" not in command_text.lower() and "monitor" not in command_text.lower():
-                        self.vision_analysis_enabled = False
-                        self.logger.info("📹 Vision analysis disabled")
-                    
-                    self.command_queue.task_done()
-                    
-                except queue.Empty:
-                    # No commands in queue, wait
-                    await asyncio.sleep(0.1)
-                    
+                        self.logger.warning("⚠️  Control agent couldn't process the command")
+                else:
+                    # Vision-only mode: handle basic vision commands
+                    if VISION_ONLY_TRIGGER_RE.search(command_text) is not None:
+                        await self._execute_image_analysis()
+                    else:
+                        self.logger.info("ℹ️  Vision-only mode: Only vision analysis commands are supported")
+                        self.logger.info("     Try: 'analyze image', 'capture and analyze', 'detect objects'")
+
+                # Disable vision analysis after command (unless it's a continuous scan)
+                if CONTINUOUS_RE.search(command_text) is None:
+                    self.vision_analysis_enabled = False
+                    self.logger.info("📹 Vision analysis disabled")
+
+                self.command_queue.task_done()
+
+            except asyncio.CancelledError:
+                break
             except Exception as e:
                 self.logger.error(f"Error executing command: {e}")
                 await asyncio.sleep(1)
@@ -201,7 +275,10 @@ class TelloDroneAgent:
         # Rotate in 45-degree increments (8 positions)
         angles_per_step = 45
         total_steps = 8
-        detected_objects = {}
+        # Flat (angle, description, confidence) tuples - results are only
+        # ever iterated in order, so a keyed dict of per-object dicts would
+        # just add allocations
+        scan_results: list[tuple[int, str, float]] = []
         
         for step in range(total_steps):
             current_angle = step * angles_per_step
@@ -219,20 +296,25 @@ class TelloDroneAgent:
                 objects = self.latest_analysis.get('objects', [])
                 if objects:
                     self.logger.info(f"🔍 At {current_angle}°: Found {len(objects)} objects")
-                    for i, obj in enumerate(objects):
-                        obj_key = f"{current_angle}°_object_{i}"
-                        detected_objects[obj_key] = {
-                            'angle': current_angle,
-                            'description': str(obj),
-                            'confidence': getattr(obj, 'confidence', 0.0)
-                        }
-        
-        # Summary of 360-degree scan
+                    # analyze_image returns plain dicts - direct key access
+                    # is both cheaper than getattr-with-default and correct
+                    # (getattr on a dict always hit the 0.0 fallback)
+                    for obj in objects:
+                        scan_results.append(
+                            (current_angle,
+                             obj.get('name', str(obj)),
+                             obj.get('confidence', 0.0))
+                        )
+
+        # Summary of 360-degree scan - emitted as one record per block so a
+        # large object count costs one handler dispatch, not one per object
         self.logger.info("🎯 360-degree scan complete!")
-        self.logger.info(f"📊 Total objects detected: {len(detected_objects)}")
-        
-        for obj_key, obj_data in detected_objects.items():
-            self.logger.info(f"  • {obj_data['angle']}°: {obj_data['description']}")
+        self.logger.info(f"📊 Total objects detected: {len(scan_results)}")
+
+        if scan_results and self.logger.isEnabledFor(logging.INFO):
+            lines = [f"  • {angle}°: {description}"
+                     for angle, description, _confidence in scan_results]
+            self.logger.info("\n".join(lines))
         
         # Disable continuous vision analysis
         self.vision_analysis_enabled = False
@@ -246,32 +328,33 @@ class TelloDroneAgent:
         await asyncio.sleep(1)  # Wait for analysis to process current frame
         
         if self.latest_analysis:
-            self.logger.info("🔍 Image Analysis Results:")
-            
-            # Objects
             objects = self.latest_analysis.get('objects', [])
-            if objects:
-                self.logger.info(f"  📦 Objects detected: {len(objects)}")
-                for i, obj in enumerate(objects[:5]):  # Show top 5
-                    self.logger.info(f"    {i+1}. {obj}")
-            
-            # People
             people = self.latest_analysis.get('people', [])
-            if people:
-                self.logger.info(f"  👥 People detected: {len(people)}")
-            
-            # Description
             description = self.latest_analysis.get('description', '')
-            if description:
-                self.logger.info(f"  📝 Description: {description}")
-            
-            # Tags
             tags = self.latest_analysis.get('tags', [])
-            if tags:
-                self.logger.info(f"  🏷️  Tags: {', '.join(tags[:10])}")  # Show top 10 tags
-            
-            if not any([objects, people, description, tags]):
-                self.logger.info("  ℹ️  No objects or features detected in current view")
+
+            # Build the whole report first and emit it as one record - one
+            # lock acquisition and handler dispatch instead of one per line
+            if self.logger.isEnabledFor(logging.INFO):
+                lines = ["🔍 Image Analysis Results:"]
+
+                if objects:
+                    lines.append(f"  📦 Objects detected: {len(objects)}")
+                    lines.extend(f"    {i+1}. {obj}" for i, obj in enumerate(objects[:5]))  # Show top 5
+
+                if people:
+                    lines.append(f"  👥 People detected: {len(people)}")
+
+                if description:
+                    lines.append(f"  📝 Description: {description}")
+
+                if tags:
+                    lines.append(f"  🏷️  Tags: {', '.join(tags[:10])}")  # Show top 10 tags
+
+                if not any([objects, people, description, tags]):
+                    lines.append("  ℹ️  No objects or features detected in current view")
+
+                self.logger.info("\n".join(lines))
         else:
             self.logger.warning("⚠️  No analysis data available - make sure camera is working")
         
@@ -298,18 +381,46 @@ class TelloDroneAgent:
                 self.logger.info("  - fly in a square pattern")
                 self.logger.info("  - Any other natural language command!")
             
-            while self.running:
-                try:
-                    command = input("🎮 Enter command: ").strip()
-                    if command.lower() in ['quit', 'exit', 'stop']:
+            def handle_line(command: str) -> bool:
+                """Dispatch one input line; returns False on a quit command."""
+                if command.lower() in ['quit', 'exit', 'stop']:
+                    self.running = False
+                    return False
+                elif command:
+                    self.add_command(command)
+                return True
+
+            if os.name == 'nt':
+                # Windows selectors can't poll console stdin - fall back to
+                # blocking input(); the daemon flag still lets the process exit
+                while self.running:
+                    try:
+                        if not handle_line(input("🎮 Enter command: ").strip()):
+                            break
+                    except (EOFError, KeyboardInterrupt):
                         self.running = False
                         break
-                    elif command:
-                        self.add_command(command)
-                except (EOFError, KeyboardInterrupt):
-                    self.running = False
-                    break
-        
+            else:
+                # Poll stdin with a short timeout so this thread notices
+                # running=False within ~200ms of a shutdown signal instead of
+                # blocking in input() until the next Enter press
+                sel = selectors.DefaultSelector()
+                sel.register(sys.stdin, selectors.EVENT_READ)
+                try:
+                    print("🎮 Enter command: ", end="", flush=True)
+                    while self.running:
+                        if not sel.select(timeout=0.2):
+                            continue
+                        line = sys.stdin.readline()
+                        if not line:  # EOF
+                            self.running = False
+                            break
+                        if not handle_line(line.strip()):
+                            break
+                        print("🎮 Enter command: ", end="", flush=True)
+                finally:
+                    sel.close()
+
         # Start input thread
         input_thread = threading.Thread(target=command_input, daemon=True)
         input_thread.start()
@@ -334,32 +445,18 @@ class TelloDroneAgent:
             # Start command interface
             self.start_command_interface()
             
-            # Start command executor
+            # Start command executor and the capture/process pipeline
             command_task = asyncio.create_task(self.execute_user_commands())
-            
-            # Main loop - just keep camera running and process frames
-            frame_count = 0
+            capture_task = asyncio.create_task(self._capture_frames())
+            process_task = asyncio.create_task(self._process_frames())
+
+            # Supervise until shutdown is requested
             while self.running:
-                try:
-                    # Capture frame (always capture, but only analyze when needed)
-                    frame = self.camera_manager.capture_single_frame()
-                    if frame is not None:
-                        await self.process_frame(frame)
-                        frame_count += 1
-                        
-                        # Log less frequently since we're not analyzing every frame
-                        if frame_count % 300 == 0:  # Every 10 seconds at 30 FPS
-                            self.logger.debug(f"Camera running: {frame_count} frames captured")
-                    
-                    # Reduce loop frequency since we're not processing every frame
-                    await asyncio.sleep(0.1)  # 10 Hz main loop
-                    
-                except Exception as e:
-                    self.logger.error(f"Error in main loop: {e}")
-                    await asyncio.sleep(1)
-            
-            # Wait for command task to complete
-            command_task.cancel()
+                await asyncio.sleep(0.1)
+
+            # Stop background tasks
+            for task in (capture_task, process_task, command_task):
+                task.cancel()
                 
         except KeyboardInterrupt:
             self.logger.info("Received interrupt signal")
@@ -369,6 +466,66 @@ class TelloDroneAgent:
         finally:
             await self.cleanup()
     
+    async def _capture_frames(self):
+        """Capture frames and keep only the freshest one queued for processing."""
+        frame_count = 0
+        resync_count = 0
+        # Drift-corrected 10 Hz pacing: sleep until the next tick rather
+        # than a fixed interval, so variable capture/processing time doesn't
+        # drag the effective frame rate below target
+        target_dt = 0.1
+        next_tick = time.perf_counter() + target_dt
+        while self.running:
+            try:
+                # Capture frame (always capture, but only analyze when needed).
+                # The read can block for tens of ms, so run it on the capture
+                # thread instead of stalling the event loop
+                frame = await self._loop.run_in_executor(
+                    self._capture_executor, self.camera_manager.capture_single_frame
+                )
+                if frame is not None:
+                    # Drop the stale frame if the consumer hasn't kept up
+                    if self.frame_queue.full():
+                        try:
+                            self.frame_queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            pass
+                    self.frame_queue.put_nowait(frame)
+                    frame_count += 1
+
+                    # Log less frequently since we're not analyzing every frame
+                    if frame_count % 300 == 0:
+                        self.logger.debug(f"Camera running: {frame_count} frames captured")
+
+                now = time.perf_counter()
+                if now - next_tick > target_dt:
+                    # More than a full tick behind: resync instead of
+                    # burst-capturing to catch up
+                    resync_count += 1
+                    self.logger.debug(f"Capture loop fell behind, resyncing ({resync_count} total)")
+                    next_tick = now + target_dt
+                else:
+                    next_tick += target_dt
+                await asyncio.sleep(max(0.0, next_tick - now))
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Error in capture loop: {e}")
+                await asyncio.sleep(1)
+
+    async def _process_frames(self):
+        """Process captured frames as soon as they become available."""
+        while self.running:
+            try:
+                frame = await self.frame_queue.get()
+                await self.process_frame(frame)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Error in frame processing loop: {e}")
+                await asyncio.sleep(1)
+
     async def cleanup(self):
         """Clean up resources with emergency landing if needed."""
         self.logger.info("Cleaning up...")
@@ -399,9 +556,13 @@ class TelloDroneAgent:
             finally:
                 self.drone_is_flying = False
         
+        if self._capture_executor:
+            self._capture_executor.shutdown(wait=False)
+            self._capture_executor = None
+
         if self.camera_manager:
             await self.camera_manager.stop()
-            
+
         if self.tello_controller:
             await self.tello_controller.disconnect()
         
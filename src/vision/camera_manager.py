@@ -130,19 +130,23 @@ class CameraManager:
         
         # Store frame reader for single frame capture
         self.tello_frame_reader = frame_reader
-        
+
+        # Track the last frame object seen so unchanged frames are not
+        # re-wrapped into a fresh ~900KB PIL image on every 33ms tick
+        last_frame = None
+
         while self.running:
             try:
-                if frame_reader and frame_reader.frame is not None:
+                if frame_reader and frame_reader.frame is not None and frame_reader.frame is not last_frame:
                     # Get frame from Tello
                     frame = frame_reader.frame
-                    
-                    # Convert to PIL Image
-                    pil_image = Image.fromarray(frame)
-                    
-                    # Call frame callback if provided
+                    last_frame = frame
+
+                    # Call frame callback if provided; the PIL wrap only
+                    # happens when someone is actually consuming it
                     if self.frame_callback:
                         try:
+                            pil_image = Image.fromarray(frame)
                             # Create a new event loop for this thread if needed
                             import asyncio
                             try:
@@ -16,7 +16,9 @@ fi
 
 # Test Tello connection
 echo "Testing Tello Connection..."
-if ping -c 1 -W 2000 192.168.10.1 > /dev/null 2>&1; then
+# -W is seconds on Linux ping (not milliseconds); -W 2000 meant a
+# 2000-second ceiling on an unreachable host
+if ping -c 1 -W 1 192.168.10.1 > /dev/null 2>&1; then
     echo "✅ Tello connection: Working"
     TELLO_OK=1
 else
@@ -2,15 +2,28 @@
 Basic tests for the Tello Drone AI Agent components.
 """
 
+import json
+import logging
 import unittest
 import sys
 import os
+from collections import OrderedDict
+from types import SimpleNamespace
 
 # Add the src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from drone.commands import DroneCommand, DroneAction, CommandValidator
 
+# The control agent pulls in the Azure OpenAI SDK and settings; skip its
+# tests where those optional dependencies are not installed
+try:
+    from agents import control_agent
+    from agents.control_agent import ControlAgent, _match_local_command
+    CONTROL_AGENT_AVAILABLE = True
+except Exception:
+    CONTROL_AGENT_AVAILABLE = False
+
 
 class TestDroneCommands(unittest.TestCase):
     """Test drone command functionality."""
@@ -128,6 +141,170 @@ class TestCommandValidator(unittest.TestCase):
         self.assertTrue(any("without takeoff" in warning for warning in warnings))
 
 
+def _make_offline_agent():
+    """Build a ControlAgent without Azure clients for offline unit tests."""
+    agent = ControlAgent.__new__(ControlAgent)
+    agent.logger = logging.getLogger("tests.control_agent")
+    agent.max_tokens = 150
+    agent.client = None
+    agent.aclient = None
+    agent.cache_hit_tokens = 0
+    agent.total_prompt_tokens = 0
+    agent._command_cache = OrderedDict()
+    agent.command_schema = control_agent._COMMAND_SCHEMA
+    agent._validator = None  # default to the fallback validation path
+    agent._system_prompt = control_agent._SYSTEM_PROMPT
+    return agent
+
+
+class _StubClient:
+    """Chat-completions client returning a fixed response body."""
+
+    def __init__(self, content):
+        create = lambda **kwargs: SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=None
+        )
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+
+@unittest.skipUnless(CONTROL_AGENT_AVAILABLE, "control agent dependencies not installed")
+class TestLocalCommandDispatch(unittest.TestCase):
+    """Test the no-network local dispatch table."""
+
+    def test_single_action_phrases_dispatch_locally(self):
+        """Unambiguous phrases map straight to command dicts."""
+        for phrase, action in [
+            ("take off", "takeoff"),
+            ("takeoff", "takeoff"),
+            ("LAND", "land"),
+            ("  hover  ", "hover"),
+            ("emergency stop", "emergency"),
+        ]:
+            command = _match_local_command(phrase)
+            self.assertIsNotNone(command, f"expected local dispatch for {phrase!r}")
+            self.assertEqual(command["action"], action)
+
+    def test_compound_phrases_are_not_dispatched(self):
+        """Anything beyond the exact phrase must go to the model."""
+        for phrase in ["land now", "take off and move forward", "move forward", "hover for 10 seconds"]:
+            self.assertIsNone(_match_local_command(phrase))
+
+    def test_templates_are_isolated_copies(self):
+        """Mutating a returned command must not leak into later dispatches."""
+        first = _match_local_command("hover")
+        first["parameters"]["duration"] = 99
+        second = _match_local_command("hover")
+        self.assertEqual(second["parameters"]["duration"], 3)
+
+
+@unittest.skipUnless(CONTROL_AGENT_AVAILABLE, "control agent dependencies not installed")
+class TestControlAgentCache(unittest.TestCase):
+    """Test the LRU command cache."""
+
+    def setUp(self):
+        self.agent = _make_offline_agent()
+
+    def test_put_then_get_round_trips(self):
+        self.agent._cache_put("take off", '{"action": "takeoff"}')
+        self.assertEqual(self.agent._cache_get("take off"), '{"action": "takeoff"}')
+        self.assertIsNone(self.agent._cache_get("land"))
+
+    def test_eviction_drops_oldest_entry(self):
+        self.agent.COMMAND_CACHE_SIZE = 2
+        self.agent._cache_put("a", "1")
+        self.agent._cache_put("b", "2")
+        self.agent._cache_put("c", "3")
+        self.assertIsNone(self.agent._cache_get("a"))
+        self.assertEqual(self.agent._cache_get("b"), "2")
+        self.assertEqual(self.agent._cache_get("c"), "3")
+
+    def test_get_refreshes_lru_position(self):
+        self.agent.COMMAND_CACHE_SIZE = 2
+        self.agent._cache_put("a", "1")
+        self.agent._cache_put("b", "2")
+        self.agent._cache_get("a")  # "b" is now the eviction candidate
+        self.agent._cache_put("c", "3")
+        self.assertEqual(self.agent._cache_get("a"), "1")
+        self.assertIsNone(self.agent._cache_get("b"))
+
+    def test_cache_clear(self):
+        self.agent._cache_put("a", "1")
+        self.agent.cache_clear()
+        self.assertIsNone(self.agent._cache_get("a"))
+
+
+@unittest.skipUnless(CONTROL_AGENT_AVAILABLE, "control agent dependencies not installed")
+class TestCommandValidation(unittest.TestCase):
+    """Test schema and fallback command validation."""
+
+    def setUp(self):
+        self.agent = _make_offline_agent()
+        self.valid_command = {
+            "action": "takeoff",
+            "parameters": {},
+            "description": "Taking off",
+            "safety_check": True
+        }
+
+    def test_fallback_accepts_valid_command(self):
+        self.assertTrue(self.agent._validate_command(self.valid_command))
+
+    def test_fallback_rejects_bad_structure(self):
+        self.assertFalse(self.agent._validate_command("not a dict"))
+        self.assertFalse(self.agent._validate_command({"action": "takeoff"}))
+
+        bad_action = dict(self.valid_command, action="teleport")
+        self.assertFalse(self.agent._validate_command(bad_action))
+
+        bad_safety = dict(self.valid_command, safety_check="yes")
+        self.assertFalse(self.agent._validate_command(bad_safety))
+
+    def test_schema_validator_path(self):
+        if control_agent.Draft7Validator is None:
+            self.skipTest("jsonschema not installed")
+        self.agent._validator = control_agent._SCHEMA_VALIDATOR
+        self.assertTrue(self.agent._validate_command(self.valid_command))
+        self.assertFalse(self.agent._validate_command(dict(self.valid_command, action="teleport")))
+
+
+@unittest.skipUnless(CONTROL_AGENT_AVAILABLE, "control agent dependencies not installed")
+class TestBatchProcessing(unittest.TestCase):
+    """Test process_commands' response handling without a network."""
+
+    def setUp(self):
+        self.agent = _make_offline_agent()
+        self.valid_command = {
+            "action": "takeoff",
+            "parameters": {},
+            "description": "Taking off",
+            "safety_check": True
+        }
+
+    def test_empty_input_returns_empty_list(self):
+        self.assertEqual(self.agent.process_commands([]), [])
+
+    def test_length_mismatch_yields_error_commands(self):
+        """A short batch response degrades to one error command per input."""
+        self.agent.client = _StubClient(json.dumps({"commands": [self.valid_command]}))
+        results = self.agent.process_commands(["take off", "land"])
+        self.assertEqual(len(results), 2)
+        for command in results:
+            self.assertEqual(command["action"], "emergency")
+            self.assertTrue(command["error"])
+
+    def test_invalid_items_become_error_commands(self):
+        """Bad entries are replaced so results still line up with inputs."""
+        bad_command = {"action": "teleport"}
+        self.agent.client = _StubClient(
+            json.dumps({"commands": [self.valid_command, bad_command]})
+        )
+        results = self.agent.process_commands(["take off", "do something odd"])
+        self.assertEqual(results[0], self.valid_command)
+        self.assertEqual(results[1]["action"], "emergency")
+        self.assertTrue(results[1]["error"])
+
+
 if __name__ == "__main__":
     # Run the tests
     print("Running Tello Drone AI Agent Tests...")